@@ -333,6 +333,7 @@ async def execute_vulnerability_scan(scan_id: int, target_url: str, scan_types:
 
         # Process each scan type
         for i, scan_type in enumerate(scan_types):
+            scanner = None
             try:
                 # Update progress
                 progress = 20 + (i * 60 // len(scan_types))
@@ -343,7 +344,6 @@ async def execute_vulnerability_scan(scan_id: int, target_url: str, scan_types:
                 scanner_logger.info(f"Starting {scan_type} scan for {target_url}")
 
                 # Execute appropriate scanner based on scan type
-                scanner = None
                 scan_results = None
 
                 if scan_type == ScanType.SQL_INJECTION.value:
@@ -393,14 +393,15 @@ async def execute_vulnerability_scan(scan_id: int, target_url: str, scan_types:
 
                         scanner_logger.info(f"Created vulnerability: {vuln_data['title']}")
 
-                # Cleanup scanner resources
-                if scanner:
-                    await scanner.cleanup()
-
             except Exception as scan_type_error:
                 scanner_logger.error(f"Error scanning {scan_type}: {str(scan_type_error)}")
                 continue
 
+            finally:
+                # Cleanup scanner resources - also on failure, so the pooled client is closed
+                if scanner:
+                    await scanner.cleanup()
+
         # Update scan completion
         scan.status = ScanStatus.COMPLETED
         scan.completed_at = datetime.utcnow()
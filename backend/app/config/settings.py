@@ -84,6 +84,7 @@ class Settings(BaseSettings):
     ]
     SQLI_UNION_MAX_COLUMNS: int = 20
     SQLI_BOOLEAN_BASELINE_REQUESTS: int = 3
+    SQLI_TIME_BASED_REQUIRES_REACTION: bool = False  # Opt-in: skip time-based probes on parameters that ignore a stray quote
 
     # Security Settings for Scanner
     SCANNER_ALLOWED_PROTOCOLS: List[str] = ["http", "https"]
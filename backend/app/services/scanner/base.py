@@ -4,16 +4,34 @@ Following existing codebase patterns and DVWA analysis findings
 """
 
 import asyncio
+import re
 import time
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any, Tuple
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qs, urlencode, quote_plus
 import httpx
 
 from app.config.logging import get_logger
 from app.config.settings import settings
 
 
+# SSRF protection - internal/private host prefixes (single str.startswith call)
+FORBIDDEN_HOST_PREFIXES = (
+    'localhost', '127.0.0.1', '0.0.0.0', '::1',
+    '10.', '172.16.', '172.17.', '172.18.', '172.19.',
+    '172.20.', '172.21.', '172.22.', '172.23.', '172.24.',
+    '172.25.', '172.26.', '172.27.', '172.28.', '172.29.',
+    '172.30.', '172.31.', '192.168.'
+)
+DEVELOPMENT_ENVIRONMENTS = frozenset({'development', 'dev', 'testing', 'test'})
+DVWA_LOCAL_HOSTS = frozenset({'localhost', '127.0.0.1'})
+
+# HTML scraping patterns - compiled once at import, not per response
+FORM_REGEX = re.compile(r'<form[^>]*>(.*?)</form>', re.DOTALL | re.IGNORECASE)
+FORM_INPUT_REGEX = re.compile(r'<input[^>]*name=["\']([^"\']+)["\'][^>]*>', re.IGNORECASE)
+DVWA_USER_TOKEN_REGEX = re.compile(r'name=["\']user_token["\'] value=["\']([^"\']+)["\']')
+
+
 class BaseScanner(ABC):
     """
     Abstract base class for all vulnerability scanners
@@ -28,7 +46,9 @@ class BaseScanner(ABC):
         
         # Rate limiting
         self.semaphore = asyncio.Semaphore(self.max_concurrent_requests)
-        self.last_request_time = 0
+        self._rate_limit_lock = asyncio.Lock()
+        self._next_request_time = 0.0
+        self._auth_lock = asyncio.Lock()
         
         # HTTP client configuration following httpx best practices
         self.client_config = {
@@ -44,6 +64,7 @@ class BaseScanner(ABC):
             ),
             'follow_redirects': False,  # Handle redirects manually for better control
             'verify': True,  # SSL verification
+            'http2': True,  # Multiplex probes over one connection when the target supports it
             'headers': {
                 'User-Agent': 'Vulnity-KP Scanner/1.0 (Security Testing)',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -57,31 +78,55 @@ class BaseScanner(ABC):
         # Session management for authenticated scanning
         self.session_cookies = {}
         self.authenticated_domains = set()
+
+        # Shared HTTP client - reused across requests for connection pooling/keep-alive
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_cookies: Dict[str, str] = {}
+
+        # Parsed (prefix, query params, suffix) per URL - payload URLs are built from these
+        self._url_templates: Dict[str, Tuple[str, Dict[str, List[str]], str]] = {}
+        self._param_url_templates: Dict[Tuple[str, str], Tuple[str, str]] = {}
     
     async def _get_http_client(self) -> httpx.AsyncClient:
         """
         Get configured HTTP client following httpx best practices
+        Created lazily and reused so every probe shares the connection pool
         """
-        # Include session cookies if available
-        client_config = self.client_config.copy()
-        if self.session_cookies:
-            client_config['cookies'] = self.session_cookies
-
-        return httpx.AsyncClient(**client_config)
+        if self._http_client is None or self._http_client.is_closed:
+            # Include session cookies if available
+            client_config = self.client_config.copy()
+            if self.session_cookies:
+                client_config['cookies'] = self.session_cookies
+
+            self._http_client = httpx.AsyncClient(**client_config)
+            self._http_client_cookies = dict(self.session_cookies)
+        elif self.session_cookies != self._http_client_cookies:
+            # Session changed (e.g. DVWA re-auth) - swap the cookie jar, keep pooled connections
+            self._http_client.cookies = self.session_cookies
+            self._http_client_cookies = dict(self.session_cookies)
+
+        return self._http_client
+
+    async def _close_http_client(self):
+        """Close the shared HTTP client (next request creates a fresh one)"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
     
     async def _rate_limit(self):
         """
         Implement rate limiting to avoid overwhelming target servers
         Following existing security patterns
+        Callers queue on a lock and leave request_delay between sends, so concurrent
+        tasks are spaced out instead of waking together; a cancelled waiter gives up
+        its turn without consuming a send slot
         """
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.request_delay:
-            sleep_time = self.request_delay - time_since_last_request
-            await asyncio.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        async with self._rate_limit_lock:
+            wait_time = self._next_request_time - time.monotonic()
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            
+            self._next_request_time = time.monotonic() + self.request_delay
     
     async def _make_request(
         self, 
@@ -98,51 +143,55 @@ class BaseScanner(ABC):
         """
         
         async with self.semaphore:
+            # Spaced inside the semaphore - a slot reserved while still queued for a permit
+            # would already have passed by the time the request goes out
             await self._rate_limit()
             
             try:
-                async with await self._get_http_client() as client:
-                    # Merge custom headers with default headers
-                    request_headers = self.client_config['headers'].copy()
-                    if headers:
-                        request_headers.update(headers)
-                    
-                    # Use custom timeout if provided
-                    request_timeout = timeout or self.session_timeout
-                    
-                    self.logger.debug(f"Making {method} request to {url}")
-                    
-                    response = await client.request(
-                        method=method,
-                        url=url,
-                        params=params,
-                        data=data,
-                        headers=request_headers,
-                        timeout=request_timeout
-                    )
-
-                    # Handle redirects manually for better control
-                    if response.status_code in [301, 302, 303, 307, 308]:
-                        redirect_url = response.headers.get('location')
-                        if redirect_url and 'login' in redirect_url.lower():
-                            self.logger.warning(f"Redirected to login page: {redirect_url}")
-                            # Try to authenticate if this is DVWA
-                            if '/dvwa/' in url.lower():
-                                auth_success = await self._authenticate_dvwa(url)
-                                if auth_success:
-                                    # Retry the original request with new session
-                                    async with await self._get_http_client() as new_client:
-                                        response = await new_client.request(
-                                            method=method,
-                                            url=url,
-                                            params=params,
-                                            data=data,
-                                            headers=request_headers,
-                                            timeout=request_timeout
-                                        )
-
-                    self.logger.debug(f"Response: {response.status_code} for {url}")
-                    return response
+                client = await self._get_http_client()
+                # Cookies this request goes out with - lets re-auth tell an expired session apart
+                # from one another probe has already refreshed
+                request_cookies = dict(self.session_cookies)
+
+                # Client already sends the default headers - only merge when overriding
+                request_headers = {**self.client_config['headers'], **headers} if headers else None
+                
+                # Use custom timeout if provided
+                request_timeout = timeout or self.session_timeout
+                
+                self.logger.debug("Making %s request to %s", method, url)
+                
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    data=data,
+                    headers=request_headers,
+                    timeout=request_timeout
+                )
+
+                # Handle redirects manually for better control
+                if response.status_code in [301, 302, 303, 307, 308]:
+                    redirect_url = response.headers.get('location')
+                    if redirect_url and 'login' in redirect_url.lower():
+                        self.logger.warning(f"Redirected to login page: {redirect_url}")
+                        # Try to authenticate if this is DVWA
+                        if '/dvwa/' in url.lower():
+                            auth_success = await self._authenticate_dvwa(url, request_cookies)
+                            if auth_success:
+                                # Session cookies changed - shared client picks them up on retry
+                                new_client = await self._get_http_client()
+                                response = await new_client.request(
+                                    method=method,
+                                    url=url,
+                                    params=params,
+                                    data=data,
+                                    headers=request_headers,
+                                    timeout=request_timeout
+                                )
+
+                self.logger.debug("Response: %s for %s", response.status_code, url)
+                return response
                     
             except httpx.TimeoutException as e:
                 self.logger.warning(f"Request timeout for {url}: {str(e)}")
@@ -193,27 +242,18 @@ class BaseScanner(ABC):
             # Security checks - prevent SSRF (but allow localhost in development)
             settings = get_settings()
 
+            host = parsed.netloc.split(':')[0].lower()
+
             # Allow localhost/internal networks in development environment
-            if settings.ENVIRONMENT.lower() in ['development', 'dev', 'testing', 'test']:
-                host = parsed.netloc.split(':')[0].lower()
-                if host in ['localhost', '127.0.0.1'] and '/dvwa/' in url.lower():
+            if settings.ENVIRONMENT.lower() in DEVELOPMENT_ENVIRONMENTS:
+                if host in DVWA_LOCAL_HOSTS and '/dvwa/' in url.lower():
                     self.logger.info(f"Allowing DVWA testing in development: {host}")
                     return True
 
             # Production security checks - prevent SSRF (following existing patterns)
-            forbidden_hosts = [
-                'localhost', '127.0.0.1', '0.0.0.0', '::1',
-                '10.', '172.16.', '172.17.', '172.18.', '172.19.',
-                '172.20.', '172.21.', '172.22.', '172.23.', '172.24.',
-                '172.25.', '172.26.', '172.27.', '172.28.', '172.29.',
-                '172.30.', '172.31.', '192.168.'
-            ]
-
-            host = parsed.netloc.split(':')[0].lower()
-            for forbidden in forbidden_hosts:
-                if host.startswith(forbidden):
-                    self.logger.warning(f"Blocked request to internal/private network: {host}")
-                    return False
+            if host.startswith(FORBIDDEN_HOST_PREFIXES):
+                self.logger.warning(f"Blocked request to internal/private network: {host}")
+                return False
 
             return True
 
@@ -229,6 +269,63 @@ class BaseScanner(ABC):
     def _build_url(self, base_url: str, path: str) -> str:
         """Build full URL from base URL and path"""
         return urljoin(base_url, path)
+
+    def _get_url_template(self, base_url: str) -> Tuple[str, Dict[str, List[str]], str]:
+        """
+        Parse base URL once into (prefix, query params, suffix)
+        Reused for every payload built against the same URL
+        """
+        template = self._url_templates.get(base_url)
+        if template is None:
+            parsed_url = urlparse(base_url)
+            prefix = urlunparse((
+                parsed_url.scheme,
+                parsed_url.netloc,
+                parsed_url.path,
+                parsed_url.params,
+                '',
+                ''
+            ))
+            suffix = f"#{parsed_url.fragment}" if parsed_url.fragment else ''
+            template = (prefix, parse_qs(parsed_url.query), suffix)
+            self._url_templates[base_url] = template
+        return template
+    
+    def _get_param_url_template(self, base_url: str, param_name: str) -> Tuple[str, str]:
+        """
+        Encode everything around one parameter's value once: (url up to 'param=', rest of url)
+        Matches urlencode(doseq=True) output with the parameter kept in its original position
+        """
+        key = (base_url, param_name)
+        template = self._param_url_templates.get(key)
+        if template is None:
+            prefix, query_params, suffix = self._get_url_template(base_url)
+            names = list(query_params)
+            position = names.index(param_name) if param_name in query_params else len(names)
+
+            before = urlencode({name: query_params[name] for name in names[:position]}, doseq=True)
+            after = urlencode({name: query_params[name] for name in names[position + 1:]}, doseq=True)
+
+            head = f"{prefix}?{before}&" if before else f"{prefix}?"
+            head += f"{quote_plus(param_name)}="
+            tail = f"&{after}{suffix}" if after else suffix
+            template = (head, tail)
+            self._param_url_templates[key] = template
+        return template
+
+    def _build_url_with_param(self, base_url: str, param_name: str, param_value: str) -> str:
+        """
+        Build URL with specific parameter value
+        """
+        try:
+            # Only the injected value is encoded per payload
+            head, tail = self._get_param_url_template(base_url, param_name)
+
+            return f"{head}{quote_plus(param_value)}{tail}"
+            
+        except Exception as e:
+            self.logger.error(f"Error building URL with parameter: {str(e)}")
+            return base_url
     
     def _responses_similar(self, response1: httpx.Response, response2: httpx.Response) -> bool:
         """
@@ -252,12 +349,9 @@ class BaseScanner(ABC):
         if response1.text == response2.text:
             return True
         
-        # Check if responses are substantially similar
-        similarity_ratio = len(set(response1.text.split()) & set(response2.text.split())) / max(
-            len(set(response1.text.split())), 
-            len(set(response2.text.split())), 
-            1
-        )
+        # Check if responses are substantially similar (each body tokenized once)
+        words1, words2 = set(response1.text.split()), set(response2.text.split())
+        similarity_ratio = len(words1 & words2) / max(len(words1), len(words2), 1)
         
         return similarity_ratio > 0.8  # 80% similarity threshold
     
@@ -269,16 +363,10 @@ class BaseScanner(ABC):
         forms = []
         
         try:
-            # Basic form extraction using regex (can be improved)
-            import re
-            
-            form_pattern = r'<form[^>]*>(.*?)</form>'
-            input_pattern = r'<input[^>]*name=["\']([^"\']+)["\'][^>]*>'
-            
-            form_matches = re.findall(form_pattern, response.text, re.DOTALL | re.IGNORECASE)
-            
-            for form_content in form_matches:
-                inputs = re.findall(input_pattern, form_content, re.IGNORECASE)
+            # Basic form extraction using regex (can be improved) - forms are streamed, not collected first
+            for form_match in FORM_REGEX.finditer(response.text):
+                form_content = form_match.group(1)
+                inputs = FORM_INPUT_REGEX.findall(form_content)
                 if inputs:
                     forms.append({
                         'inputs': inputs,
@@ -305,9 +393,28 @@ class BaseScanner(ABC):
         """
         pass
     
-    async def _authenticate_dvwa(self, base_url: str) -> bool:
+    async def _authenticate_dvwa(self, base_url: str, stale_cookies: Optional[Dict[str, str]] = None) -> bool:
         """
         Authenticate with DVWA if needed
+        Serialised - probes redirected to the login page at the same time share one login instead
+        of wiping the cookie jar under each other. stale_cookies are the session cookies the
+        redirected request was sent with
+        """
+        async with self._auth_lock:
+            if stale_cookies is not None and '/dvwa/' in base_url.lower():
+                domain = self._extract_base_url(base_url)
+                if domain in self.authenticated_domains:
+                    if self.session_cookies != stale_cookies:
+                        # Another probe already re-authenticated while this one waited
+                        return True
+                    # The session those cookies belonged to has expired - log in again
+                    self.authenticated_domains.discard(domain)
+
+            return await self._login_dvwa(base_url)
+
+    async def _login_dvwa(self, base_url: str) -> bool:
+        """
+        Log in to DVWA on a dedicated client (caller holds _auth_lock)
         """
         try:
             # Check if this is a DVWA URL
@@ -322,19 +429,14 @@ class BaseScanner(ABC):
 
             self.logger.info(f"Attempting DVWA authentication for {domain}")
 
-            # Clear any existing cookies first
-            self.session_cookies.clear()
-
-            # Create a new client without existing cookies for authentication
-            auth_client_config = self.client_config.copy()
-            auth_client_config['follow_redirects'] = True  # Allow redirects during auth
-
-            async with httpx.AsyncClient(**auth_client_config) as client:
+            # Log in on a short-lived client with its own cookie jar - clearing the shared client's
+            # jar would send probes still in flight without a session
+            async with httpx.AsyncClient(**self.client_config) as client:
                 # Try to access DVWA login page
                 login_url = f"{domain}/dvwa/login.php"
 
                 # Get login page to extract CSRF token if needed
-                login_response = await client.get(login_url)
+                login_response = await client.get(login_url, follow_redirects=True)
 
                 self.logger.debug(f"Login page response: {login_response.status_code}")
                 self.logger.debug(f"Login page URL: {login_response.url}")
@@ -343,17 +445,13 @@ class BaseScanner(ABC):
                     self.logger.warning(f"Could not access DVWA login page: {login_response.status_code}")
                     return False
 
-                # Store any initial cookies from login page
                 if login_response.cookies:
-                    for cookie_name, cookie_value in login_response.cookies.items():
-                        self.session_cookies[cookie_name] = cookie_value
-                        self.logger.debug(f"Initial cookie: {cookie_name}={cookie_value}")
+                    self.logger.debug("Initial cookies: %s", list(login_response.cookies.keys()))
 
                 # Check if we need to extract CSRF token
                 csrf_token = None
                 if 'user_token' in login_response.text:
-                    import re
-                    token_match = re.search(r'name=["\']user_token["\'] value=["\']([^"\']+)["\']', login_response.text)
+                    token_match = DVWA_USER_TOKEN_REGEX.search(login_response.text)
                     if token_match:
                         csrf_token = token_match.group(1)
                         self.logger.debug(f"Found CSRF token: {csrf_token}")
@@ -369,26 +467,23 @@ class BaseScanner(ABC):
                 if csrf_token:
                     login_data['user_token'] = csrf_token
 
-                # Perform login with existing cookies
+                # Perform login with the cookies the login page set
                 self.logger.debug(f"Attempting login with data: {login_data}")
                 auth_response = await client.post(
                     login_url,
                     data=login_data,
-                    cookies=self.session_cookies
+                    follow_redirects=True  # Allow redirects during auth
                 )
 
                 self.logger.debug(f"Login response: {auth_response.status_code}")
                 self.logger.debug(f"Login response URL: {auth_response.url}")
 
-                # Store all session cookies from login response
                 if auth_response.cookies:
-                    for cookie_name, cookie_value in auth_response.cookies.items():
-                        self.session_cookies[cookie_name] = cookie_value
-                        self.logger.debug(f"Login cookie: {cookie_name}={cookie_value}")
+                    self.logger.debug("Login cookies: %s", list(auth_response.cookies.keys()))
 
                 # Test if authentication worked by trying to access a protected page
                 test_url = f"{domain}/dvwa/vulnerabilities/sqli/"
-                test_response = await client.get(test_url, cookies=self.session_cookies)
+                test_response = await client.get(test_url, follow_redirects=True)
 
                 self.logger.debug(f"Test response: {test_response.status_code}")
                 self.logger.debug(f"Test response URL: {test_response.url}")
@@ -396,6 +491,9 @@ class BaseScanner(ABC):
 
                 # If we can access the vulnerability page without redirect, auth succeeded
                 if test_response.status_code == 200 and 'login' not in test_response.url.path.lower():
+                    # Swap in every cookie the login flow set, including ones set on redirect hops.
+                    # Replaced, not mutated - the shared client picks the new session up on its next request
+                    self.session_cookies = {cookie.name: cookie.value for cookie in client.cookies.jar}
                     self.authenticated_domains.add(domain)
                     self.logger.info(f"Successfully authenticated with DVWA at {domain}")
                     self.logger.debug(f"Session cookies: {list(self.session_cookies.keys())}")
@@ -414,6 +512,7 @@ class BaseScanner(ABC):
         Cleanup resources
         Following existing cleanup patterns
         """
+        await self._close_http_client()
         self.session_cookies.clear()
         self.authenticated_domains.clear()
         self.logger.info("Scanner cleanup completed")
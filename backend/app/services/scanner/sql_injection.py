@@ -6,9 +6,10 @@ Based on DVWA analysis findings and BaseScanner patterns
 import asyncio
 import json
 import re
+import threading
 import time
+from datetime import timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from urllib.parse import urljoin, urlparse, parse_qs, urlunparse, urlencode
 import httpx
 
 from app.config.logging import get_logger
@@ -17,6 +18,197 @@ from app.models.vulnerability import VulnerabilityType, VulnerabilityRisk
 from .base import BaseScanner
 
 
+# SQL error patterns (from settings, DVWA findings) - compiled once at import, shared by all instances
+SQLI_ERROR_PATTERNS = tuple(getattr(settings, 'SQLI_ERROR_PATTERNS', [
+    r"SQL syntax.*error",
+    r"mysqli_sql_exception",
+    r"You have an error in your SQL syntax",
+    r"Warning: mysql_",
+    r"mysql_fetch_array",
+    r"mysql_num_rows",
+    r"ORA-01756",
+    r"Microsoft OLE DB Provider"
+]))
+
+# Fused alternation: one pass over the body decides whether any error pattern matches
+SQLI_ERROR_REGEX = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in SQLI_ERROR_PATTERNS), re.IGNORECASE
+)
+COMPILED_SQLI_ERROR_PATTERNS = tuple(
+    (pattern, re.compile(pattern, re.IGNORECASE)) for pattern in SQLI_ERROR_PATTERNS
+)
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """
+    Return a lowercase literal every match of the pattern must contain, or None
+    """
+    if '|' in pattern:
+        return None
+    literal = re.match(r"[A-Za-z0-9_ :'-]*", pattern).group()
+    # A trailing quantifier makes the last literal character optional
+    if pattern[len(literal):len(literal) + 1] in ('?', '*', '{'):
+        literal = literal[:-1]
+    return literal.lower() if len(literal) >= 3 else None
+
+
+# Substring prefilter: bodies containing none of these literals cannot match the fused regex.
+# Disabled (None) when any configured pattern has no guaranteed literal.
+_SQLI_ERROR_LITERALS = tuple(_required_literal(pattern) for pattern in SQLI_ERROR_PATTERNS)
+SQLI_ERROR_LITERALS = None if None in _SQLI_ERROR_LITERALS else tuple(dict.fromkeys(_SQLI_ERROR_LITERALS))
+
+# DBMS fingerprints: one named group per DBMS, so a single search identifies the backend
+SQLI_DBMS_ERROR_PATTERNS = {
+    'mysql': (r"SQL syntax.*MySQL", r"Warning.*mysqli?_", r"mysqli_sql_exception", r"MySQL server version", r"MariaDB"),
+    'postgresql': (r"PostgreSQL.*ERROR", r"pg_query\(\)", r"pg_exec\(\)", r"PSQLException", r"unterminated quoted string"),
+    'mssql': (r"Microsoft SQL Server", r"ODBC SQL Server Driver", r"SQLServer JDBC", r"Unclosed quotation mark"),
+    'oracle': (r"ORA-\d{5}", r"Oracle error", r"quoted string not properly terminated"),
+    'sqlite': (r"SQLite", r"sqlite3\.", r"SQLITE_ERROR"),
+}
+SQLI_DBMS_REGEX = re.compile(
+    "|".join(
+        f"(?P<{dbms}>{'|'.join(f'(?:{pattern})' for pattern in patterns)})"
+        for dbms, patterns in SQLI_DBMS_ERROR_PATTERNS.items()
+    ),
+    re.IGNORECASE
+)
+
+# Delay requested by a time-based payload (MySQL SLEEP, PostgreSQL pg_sleep, MSSQL WAITFOR DELAY)
+SQLI_DELAY_REGEX = re.compile(r"SLEEP\((\d+)\)|pg_sleep\((\d+)\)|DELAY\s+'0:0:(\d+)'", re.IGNORECASE)
+SQLI_DEFAULT_DELAY = 5
+
+# Distinct response bodies whose SQL error scan result is memoised per scanner
+SQLI_ERROR_SCAN_CACHE_SIZE = 512
+
+# Bodies larger than this are scanned for error patterns in a worker thread
+SQLI_ERROR_SCAN_OFFLOAD_SIZE = 32 * 1024  # characters
+
+# Generic SQL words an error-based probe may surface (substring checks on lowercased bodies)
+SQLI_RESPONSE_INDICATORS = (
+    'syntax error', 'mysql', 'sql', 'database', 'table', 'column',
+    'select', 'union', 'where', 'from', 'error', 'warning'
+)
+
+# Database information a successful UNION probe tends to disclose
+SQLI_UNION_INDICATORS = (
+    'mysql',
+    'version()',
+    'database()',
+    'user()',
+    'information_schema',
+    'table_name',
+    'column_name'
+)
+
+# Typical database version patterns (matched against lowercased bodies)
+SQLI_VERSION_PATTERNS = (
+    r'\d+\.\d+\.\d+',  # Version numbers like 5.7.34
+    r'mariadb',
+    r'mysql'
+)
+# Fused into one alternation with a named group per pattern, so a single finditer pass reports
+# every pattern present - the alternatives cannot overlap (digits vs. distinct words)
+SQLI_VERSION_REGEX = re.compile(
+    "|".join(f"(?P<v{index}>{pattern})" for index, pattern in enumerate(SQLI_VERSION_PATTERNS))
+)
+
+# A stray-quote probe whose body length moves less than this (and shows no SQL error or
+# status change) marks the parameter as cold - time-based payloads are skipped for it
+SQLI_QUOTE_PROBE_LENGTH_TOLERANCE = 10  # characters
+
+# Injection type -> VulnerabilityType value (built once, looked up per finding)
+INJECTION_TYPE_TO_VULN_TYPE = {
+    'error_based': VulnerabilityType.ERROR_BASED_SQLI.value,
+    'union_based': VulnerabilityType.UNION_BASED_SQLI.value,
+    'boolean_based': VulnerabilityType.BOOLEAN_BLIND_SQLI.value,
+    'time_based': VulnerabilityType.TIME_BASED_SQLI.value
+}
+
+
+# SQL injection payloads based on DVWA analysis findings - built once at import, shared by all instances
+SQLI_PAYLOADS = (
+    # Error-based payloads
+    {
+        'name': 'Single Quote Error Test',
+        'payload': "'",
+        'type': 'error_based',
+        'risk': VulnerabilityRisk.HIGH,
+        'description': 'Basic single quote to trigger SQL syntax error'
+    },
+    {
+        'name': 'Double Quote Error Test', 
+        'payload': '"',
+        'type': 'error_based',
+        'risk': VulnerabilityRisk.HIGH,
+        'description': 'Double quote to trigger SQL syntax error'
+    },
+    
+    # Boolean-based payloads
+    {
+        'name': 'Boolean OR True',
+        'payload': "1' OR '1'='1",
+        'type': 'boolean_based',
+        'risk': VulnerabilityRisk.HIGH,
+        'description': 'Boolean-based injection with always true condition'
+    },
+    {
+        'name': 'Boolean AND True',
+        'payload': "1' AND '1'='1",
+        'type': 'boolean_based', 
+        'risk': VulnerabilityRisk.MEDIUM,
+        'description': 'Boolean-based injection with true condition'
+    },
+    {
+        'name': 'Boolean AND False',
+        'payload': "1' AND '1'='2",
+        'type': 'boolean_based',
+        'risk': VulnerabilityRisk.MEDIUM,
+        'description': 'Boolean-based injection with false condition'
+    },
+    
+    # Union-based payloads
+    {
+        'name': 'Union Select Version',
+        'payload': "1' UNION SELECT null,version()--",
+        'type': 'union_based',
+        'risk': VulnerabilityRisk.CRITICAL,
+        'description': 'Union-based injection to extract database version'
+    },
+    {
+        'name': 'Union Select Database',
+        'payload': "1' UNION SELECT null,database()--",
+        'type': 'union_based',
+        'risk': VulnerabilityRisk.CRITICAL,
+        'description': 'Union-based injection to extract database name'
+    },
+    {
+        'name': 'Union Select User',
+        'payload': "1' UNION SELECT null,user()--",
+        'type': 'union_based',
+        'risk': VulnerabilityRisk.CRITICAL,
+        'description': 'Union-based injection to extract database user'
+    },
+    
+    # Time-based payloads
+    {
+        'name': 'Time-based Blind MySQL',
+        'payload': "1' AND SLEEP(5)--",
+        'type': 'time_based',
+        'database': 'mysql',
+        'risk': VulnerabilityRisk.HIGH,
+        'description': 'Time-based blind injection using SLEEP function'
+    },
+    {
+        'name': 'Time-based Blind PostgreSQL',
+        'payload': "1'; SELECT pg_sleep(5)--",
+        'type': 'time_based',
+        'database': 'postgresql',
+        'risk': VulnerabilityRisk.HIGH,
+        'description': 'Time-based blind injection for PostgreSQL'
+    }
+)
+
+
 class SQLInjectionScanner(BaseScanner):
     """
     Concrete SQL Injection Scanner implementation
@@ -27,100 +219,23 @@ class SQLInjectionScanner(BaseScanner):
         super().__init__()
         self.logger = get_logger("scanner.sql_injection")
         self.payloads = self._load_sql_payloads()
-        self.error_patterns = getattr(settings, 'SQLI_ERROR_PATTERNS', [
-            r"SQL syntax.*error",
-            r"mysqli_sql_exception",
-            r"You have an error in your SQL syntax",
-            r"Warning: mysql_",
-            r"mysql_fetch_array",
-            r"mysql_num_rows",
-            r"ORA-01756",
-            r"Microsoft OLE DB Provider"
-        ])
+        self._baseline_requests: Dict[str, asyncio.Task] = {}
+        self.error_patterns = list(SQLI_ERROR_PATTERNS)
+        self.error_regex = SQLI_ERROR_REGEX
+        self.compiled_error_patterns = COMPILED_SQLI_ERROR_PATTERNS
+        self.error_literals = SQLI_ERROR_LITERALS
+        self.dbms_regex = SQLI_DBMS_REGEX
+        self.time_based_requires_reaction = getattr(settings, 'SQLI_TIME_BASED_REQUIRES_REACTION', False)
+        self._error_scan_cache: Dict[str, Tuple[Tuple[str, ...], Optional[str]]] = {}
+        # Large bodies are scanned in executor threads while the loop scans small ones
+        self._error_scan_cache_lock = threading.Lock()
+        self._quote_probe_results: Dict[Tuple[str, str], bool] = {}
         
     def _load_sql_payloads(self) -> List[Dict[str, Any]]:
         """
         Load SQL injection payloads based on DVWA analysis findings
         """
-        return [
-            # Error-based payloads
-            {
-                'name': 'Single Quote Error Test',
-                'payload': "'",
-                'type': 'error_based',
-                'risk': VulnerabilityRisk.HIGH,
-                'description': 'Basic single quote to trigger SQL syntax error'
-            },
-            {
-                'name': 'Double Quote Error Test', 
-                'payload': '"',
-                'type': 'error_based',
-                'risk': VulnerabilityRisk.HIGH,
-                'description': 'Double quote to trigger SQL syntax error'
-            },
-            
-            # Boolean-based payloads
-            {
-                'name': 'Boolean OR True',
-                'payload': "1' OR '1'='1",
-                'type': 'boolean_based',
-                'risk': VulnerabilityRisk.HIGH,
-                'description': 'Boolean-based injection with always true condition'
-            },
-            {
-                'name': 'Boolean AND True',
-                'payload': "1' AND '1'='1",
-                'type': 'boolean_based', 
-                'risk': VulnerabilityRisk.MEDIUM,
-                'description': 'Boolean-based injection with true condition'
-            },
-            {
-                'name': 'Boolean AND False',
-                'payload': "1' AND '1'='2",
-                'type': 'boolean_based',
-                'risk': VulnerabilityRisk.MEDIUM,
-                'description': 'Boolean-based injection with false condition'
-            },
-            
-            # Union-based payloads
-            {
-                'name': 'Union Select Version',
-                'payload': "1' UNION SELECT null,version()--",
-                'type': 'union_based',
-                'risk': VulnerabilityRisk.CRITICAL,
-                'description': 'Union-based injection to extract database version'
-            },
-            {
-                'name': 'Union Select Database',
-                'payload': "1' UNION SELECT null,database()--",
-                'type': 'union_based',
-                'risk': VulnerabilityRisk.CRITICAL,
-                'description': 'Union-based injection to extract database name'
-            },
-            {
-                'name': 'Union Select User',
-                'payload': "1' UNION SELECT null,user()--",
-                'type': 'union_based',
-                'risk': VulnerabilityRisk.CRITICAL,
-                'description': 'Union-based injection to extract database user'
-            },
-            
-            # Time-based payloads
-            {
-                'name': 'Time-based Blind MySQL',
-                'payload': "1' AND SLEEP(5)--",
-                'type': 'time_based',
-                'risk': VulnerabilityRisk.HIGH,
-                'description': 'Time-based blind injection using SLEEP function'
-            },
-            {
-                'name': 'Time-based Blind PostgreSQL',
-                'payload': "1'; SELECT pg_sleep(5)--",
-                'type': 'time_based',
-                'risk': VulnerabilityRisk.HIGH,
-                'description': 'Time-based blind injection for PostgreSQL'
-            }
-        ]
+        return list(SQLI_PAYLOADS)
     
     async def scan(self, target_url: str, **kwargs) -> Dict[str, Any]:
         """
@@ -152,36 +267,78 @@ class SQLInjectionScanner(BaseScanner):
         try:
             # Extract parameters from URL
             parameters = self._extract_parameters(target_url)
+
+            # If no URL parameters found, try to discover form parameters
+            if not parameters:
+                self.logger.info(f"No URL parameters found, attempting form discovery for: {target_url}")
+                parameters = await self._discover_form_parameters(target_url)
+
             scan_results['scan_metadata']['parameters_tested'] = list(parameters.keys())
             
             if not parameters:
                 self.logger.warning(f"No parameters found in URL: {target_url}")
                 return scan_results
             
+            # Time-based payloads measure response delay - screened in their own batch
+            concurrent_payloads = [p for p in self.payloads if p['type'] != 'time_based']
+            timed_payloads = [p for p in self.payloads if p['type'] == 'time_based']
+
             # Test each parameter with each payload
+            vulnerabilities = []
+            detected_databases = {}
+            reactive_parameters = {}
             for param_name, param_value in parameters.items():
                 self.logger.info(f"Testing parameter: {param_name}")
                 
-                for payload_info in self.payloads:
-                    scan_results['scan_summary']['total_tests'] += 1
-                    
-                    vulnerability = await self._test_sql_injection(
-                        target_url, param_name, param_value, payload_info
+                # Independent payloads run concurrently, bounded by the base semaphore.
+                # The stray-quote probe deciding time-based testing rides along with them
+                if self.time_based_requires_reaction:
+                    param_results, reacted = await asyncio.gather(
+                        self._test_payload_batch(target_url, param_name, param_value, concurrent_payloads),
+                        self._reacts_to_quote_probe(target_url, param_name, param_value)
+                    )
+                else:
+                    param_results = await self._test_payload_batch(
+                        target_url, param_name, param_value, concurrent_payloads
                     )
+                    reacted = True
+                vulnerabilities.extend(param_results)
+                if reacted:
+                    reactive_parameters[param_name] = param_value
+
+                # Remember the DBMS fingerprinted by error-based hits to steer time-based testing
+                for vulnerability in param_results:
+                    database = vulnerability['evidence'].get('database') if vulnerability else None
+                    if database and database != 'unknown':
+                        detected_databases[param_name] = database
+
+            # Time-based probes for every parameter at once instead of one delay after another.
+            # Parameters whose response ignored a stray quote are skipped
+            skipped_parameters = len(parameters) - len(reactive_parameters)
+            if skipped_parameters:
+                self.logger.info(
+                    f"Skipping time-based payloads for {skipped_parameters} parameter(s) that ignored a stray quote"
+                )
+            vulnerabilities.extend(await self._test_time_based_batch(
+                target_url, reactive_parameters, timed_payloads, detected_databases
+            ))
+                
+            for vulnerability in vulnerabilities:
+                scan_results['scan_summary']['total_tests'] += 1
+                
+                if vulnerability:
+                    scan_results['vulnerabilities'].append(vulnerability)
+                    scan_results['scan_summary']['vulnerabilities_found'] += 1
                     
-                    if vulnerability:
-                        scan_results['vulnerabilities'].append(vulnerability)
-                        scan_results['scan_summary']['vulnerabilities_found'] += 1
-                        
-                        # Count by risk level
-                        if vulnerability['risk'] == VulnerabilityRisk.CRITICAL.value:
-                            scan_results['scan_summary']['critical_count'] += 1
-                        elif vulnerability['risk'] == VulnerabilityRisk.HIGH.value:
-                            scan_results['scan_summary']['high_count'] += 1
-                        elif vulnerability['risk'] == VulnerabilityRisk.MEDIUM.value:
-                            scan_results['scan_summary']['medium_count'] += 1
-                        
-                        self.logger.warning(f"SQL injection vulnerability found: {vulnerability['title']}")
+                    # Count by risk level
+                    if vulnerability['risk'] == VulnerabilityRisk.CRITICAL.value:
+                        scan_results['scan_summary']['critical_count'] += 1
+                    elif vulnerability['risk'] == VulnerabilityRisk.HIGH.value:
+                        scan_results['scan_summary']['high_count'] += 1
+                    elif vulnerability['risk'] == VulnerabilityRisk.MEDIUM.value:
+                        scan_results['scan_summary']['medium_count'] += 1
+                    
+                    self.logger.warning(f"SQL injection vulnerability found: {vulnerability['title']}")
             
             # Finalize scan metadata
             scan_results['scan_metadata']['end_time'] = time.time()
@@ -201,29 +358,26 @@ class SQLInjectionScanner(BaseScanner):
             self.logger.error(f"Error during SQL injection scan: {str(e)}")
             scan_results['error'] = str(e)
             return scan_results
+        finally:
+            # Baselines are only valid for this scan's session state
+            self._baseline_requests.clear()
+            self._quote_probe_results.clear()
     
     def _extract_parameters(self, url: str) -> Dict[str, str]:
         """
-        Extract parameters from URL and discover form parameters
-        Enhanced to support auto-discovery of form inputs
+        Extract parameters from URL query string
+        Form inputs are discovered separately by scan() when the URL has none
         """
         parameters = {}
 
         try:
-            # 1. Extract GET parameters from URL query string
-            parsed_url = urlparse(url)
-            url_params = parse_qs(parsed_url.query)
+            # Extract GET parameters from URL query string (parsed once, shared with URL building)
+            _, url_params, _ = self._get_url_template(url)
 
             # Convert list values to single values
             for key, values in url_params.items():
                 parameters[key] = values[0] if values else ''
 
-            # 2. If no URL parameters found, try to discover form parameters
-            if not parameters:
-                self.logger.info(f"No URL parameters found, attempting form discovery for: {url}")
-                form_params = self._discover_form_parameters(url)
-                parameters.update(form_params)
-
             self.logger.info(f"Extracted {len(parameters)} parameters: {list(parameters.keys())}")
             return parameters
 
@@ -231,71 +385,201 @@ class SQLInjectionScanner(BaseScanner):
             self.logger.error(f"Error extracting parameters from URL {url}: {str(e)}")
             return {}
 
-    def _discover_form_parameters(self, url: str) -> Dict[str, str]:
+    async def _discover_form_parameters(self, url: str) -> Dict[str, str]:
         """
         Discover form parameters by parsing HTML content
         Auto-detect input fields that can be tested for SQL injection
         """
         try:
-            import httpx
-            from bs4 import BeautifulSoup
+            from bs4 import BeautifulSoup, SoupStrainer
 
             self.logger.info(f"Attempting to discover form parameters from: {url}")
 
-            # Make request to get HTML content using httpx
-            with httpx.Client(timeout=10, verify=False) as client:
-                response = client.get(url)
-                response.raise_for_status()
-
-                # Parse HTML content
-                soup = BeautifulSoup(response.content, 'html.parser')
-                parameters = {}
-
-                # Find all forms
-                forms = soup.find_all('form')
-                self.logger.info(f"Found {len(forms)} forms on the page")
-
-                for form in forms:
-                    # Get form action and method
-                    action = form.get('action', '')
-                    method = form.get('method', 'get').lower()
-
-                    # Find all input fields
-                    inputs = form.find_all(['input', 'select', 'textarea'])
-
-                    for input_field in inputs:
-                        name = input_field.get('name')
-                        input_type = input_field.get('type', 'text').lower()
-                        value = input_field.get('value', '')
-
-                        if name and input_type not in ['submit', 'button', 'reset', 'file']:
-                            # Use default test values for different input types
-                            if input_type in ['text', 'search', 'url']:
-                                parameters[name] = value or '1'  # Default test value
-                            elif input_type == 'hidden':
-                                parameters[name] = value or 'test'
-                            elif input_type == 'number':
-                                parameters[name] = value or '1'
-                            else:
-                                parameters[name] = value or 'test'
-
-                            self.logger.info(f"Discovered parameter: {name} = {parameters[name]}")
-
-                # If no form parameters found, try common parameter names
-                if not parameters:
-                    self.logger.info("No form parameters found, trying common parameter names")
-                    common_params = ['id', 'user', 'search', 'q', 'query', 'name', 'username']
-                    for param in common_params:
-                        parameters[param] = '1'  # Default test value
-                        self.logger.info(f"Added common parameter: {param} = 1")
-
-                return parameters
+            # Lab targets (e.g. DVWA) often serve self-signed certificates - discovery keeps its
+            # unverified fetch, so it runs on its own async client instead of the pooled one
+            discovery_config = {**self.client_config, 'timeout': 10, 'verify': False}
+            async with self.semaphore:
+                await self._rate_limit()
+                async with httpx.AsyncClient(cookies=self.session_cookies, **discovery_config) as client:
+                    response = await client.get(url)
+            response.raise_for_status()
+
+            # Parse HTML content - only <form> subtrees are built, the rest of the page is skipped
+            soup = BeautifulSoup(response.content, 'html.parser', parse_only=SoupStrainer('form'))
+            parameters = {}
+
+            # Find all forms
+            forms = soup.find_all('form')
+            self.logger.info(f"Found {len(forms)} forms on the page")
+
+            for form in forms:
+                # Get form action and method
+                action = form.get('action', '')
+                method = form.get('method', 'get').lower()
+
+                # Find all input fields
+                inputs = form.find_all(['input', 'select', 'textarea'])
+
+                for input_field in inputs:
+                    name = input_field.get('name')
+                    input_type = input_field.get('type', 'text').lower()
+                    value = input_field.get('value', '')
+
+                    if name and input_type not in ['submit', 'button', 'reset', 'file']:
+                        # Use default test values for different input types
+                        if input_type in ['text', 'search', 'url']:
+                            parameters[name] = value or '1'  # Default test value
+                        elif input_type == 'hidden':
+                            parameters[name] = value or 'test'
+                        elif input_type == 'number':
+                            parameters[name] = value or '1'
+                        else:
+                            parameters[name] = value or 'test'
+
+                        self.logger.info(f"Discovered parameter: {name} = {parameters[name]}")
+
+            # If no form parameters found, try common parameter names
+            if not parameters:
+                self.logger.info("No form parameters found, trying common parameter names")
+                common_params = ['id', 'user', 'search', 'q', 'query', 'name', 'username']
+                for param in common_params:
+                    parameters[param] = '1'  # Default test value
+                    self.logger.info(f"Added common parameter: {param} = 1")
+
+            return parameters
 
         except Exception as e:
             self.logger.warning(f"Could not discover form parameters from {url}: {str(e)}")
             # Fallback: return common parameters for testing
             return {'id': '1', 'user': 'test'}
 
+    async def _test_payload_batch(
+        self, target_url: str, param_name: str, param_value: str, payloads: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Test payloads for one parameter concurrently
+        Once an error-based payload confirms the parameter, the remaining error-based
+        probes are cancelled instead of sent. Returns results for the probes actually tested
+        """
+        tasks = {
+            asyncio.ensure_future(
+                self._test_sql_injection(target_url, param_name, param_value, payload_info)
+            ): payload_info
+            for payload_info in payloads
+        }
+
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                error_confirmed = any(
+                    not task.cancelled() and task.result() and tasks[task]['type'] == 'error_based'
+                    for task in done
+                )
+                if error_confirmed:
+                    for task in pending:
+                        if tasks[task]['type'] == 'error_based':
+                            task.cancel()
+        finally:
+            # Don't leave probes running if the scan itself is cancelled
+            for task in pending:
+                task.cancel()
+
+        return [task.result() for task in tasks if not task.cancelled()]
+
+    async def _reacts_to_quote_probe(self, target_url: str, param_name: str, param_value: str) -> bool:
+        """
+        Cheap pre-check before the slow time-based payloads: append a stray quote to the value
+        The parameter is cold only if the probe shows no SQL error, the same status and a
+        length within SQLI_QUOTE_PROBE_LENGTH_TOLERANCE of the shared baseline.
+        A failed request keeps the parameter in scope. Memoised per (url, parameter) for the scan
+        """
+        key = (target_url, param_name)
+        reacted = self._quote_probe_results.get(key)
+        if reacted is not None:
+            return reacted
+
+        baseline_response, probe_response = await asyncio.gather(
+            self._get_baseline_response(target_url, param_name, param_value),
+            self._make_malicious_request(target_url, param_name, f"{param_value}'")
+        )
+        if not baseline_response or not probe_response:
+            return True
+
+        _, database = self._scan_sql_errors(probe_response['content'].lower())
+        reacted = (
+            database is not None or
+            probe_response['status_code'] != baseline_response['status_code'] or
+            abs(probe_response['content_length'] - baseline_response['content_length'])
+            >= SQLI_QUOTE_PROBE_LENGTH_TOLERANCE
+        )
+        self._quote_probe_results[key] = reacted
+        return reacted
+
+    async def _test_time_based_batch(
+        self,
+        target_url: str,
+        parameters: Dict[str, str],
+        timed_payloads: List[Dict[str, Any]],
+        detected_databases: Optional[Dict[str, str]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Test time-based payloads for all parameters
+        Parameters with a fingerprinted DBMS try that DBMS's payloads first and only
+        fall back to the others when none of them confirm. Returns results for the probes actually tested
+        """
+        detected_databases = detected_databases or {}
+        probes = [
+            (param_name, param_value, payload_info)
+            for param_name, param_value in parameters.items()
+            for payload_info in timed_payloads
+        ]
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+
+        prioritized = [
+            index for index, (param_name, _, payload_info) in enumerate(probes)
+            if detected_databases.get(param_name) is not None
+            and payload_info.get('database') == detected_databases[param_name]
+        ]
+        screened = await self._screen_time_based(target_url, probes, prioritized)
+        for index, vulnerability in zip(prioritized, screened):
+            results[index] = vulnerability
+
+        confirmed_params = {probes[index][0] for index in prioritized if results[index]}
+        remaining = [
+            index for index in range(len(probes))
+            if index not in results and probes[index][0] not in confirmed_params
+        ]
+        screened = await self._screen_time_based(target_url, probes, remaining)
+        for index, vulnerability in zip(remaining, screened):
+            results[index] = vulnerability
+
+        # Skipped fallback probes were never sent and are left out
+        return [results[index] for index in sorted(results)]
+
+    async def _screen_time_based(
+        self, target_url: str, probes: List[Tuple[str, str, Dict[str, Any]]], indexes: List[int]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Screen time-based probes concurrently, then confirm each hit on its own
+        Concurrent probes can queue behind each other on the target (e.g. PHP session
+        locks), so a delay seen in the batch only counts once it reproduces in isolation
+        """
+        screened = await asyncio.gather(*[
+            self._test_sql_injection(target_url, *probes[index]) for index in indexes
+        ])
+
+        # A lone probe already ran in isolation - its result needs no confirmation request
+        if len(indexes) == 1:
+            return list(screened)
+
+        results = []
+        for index, vulnerability in zip(indexes, screened):
+            if vulnerability:
+                vulnerability = await self._test_sql_injection(target_url, *probes[index])
+            results.append(vulnerability)
+        return results
+
     async def _test_sql_injection(
         self, 
         base_url: str, 
@@ -309,16 +593,22 @@ class SQLInjectionScanner(BaseScanner):
         """
         
         try:
-            # Get baseline response first
-            baseline_response = await self._make_baseline_request(base_url, param_name, original_value)
-            if not baseline_response:
-                return None
-            
-            # Test with malicious payload
-            malicious_response = await self._make_malicious_request(
-                base_url, param_name, payload_info['payload']
-            )
-            if not malicious_response:
+            if payload_info['type'] == 'time_based':
+                # Baseline first - a concurrent delayed probe could slow the baseline and hide the delay
+                baseline_response = await self._get_baseline_response(base_url, param_name, original_value)
+                if not baseline_response:
+                    return None
+                
+                malicious_response = await self._make_malicious_request(
+                    base_url, param_name, payload_info['payload']
+                )
+            else:
+                # Baseline (shared by every payload for this parameter) and probe in flight together
+                baseline_response, malicious_response = await asyncio.gather(
+                    self._get_baseline_response(base_url, param_name, original_value),
+                    self._make_malicious_request(base_url, param_name, payload_info['payload'])
+                )
+            if not baseline_response or not malicious_response:
                 return None
             
             # Analyze responses for vulnerability
@@ -330,7 +620,7 @@ class SQLInjectionScanner(BaseScanner):
             if vulnerability:
                 self.logger.info(f"[SUCCESS] Vulnerability detected: {payload_info['name']} on parameter '{param_name}' with confidence {vulnerability.get('confidence', 0)}")
             else:
-                self.logger.debug(f"[FAIL] No vulnerability detected: {payload_info['name']} on parameter '{param_name}'")
+                self.logger.debug("[FAIL] No vulnerability detected: %s on parameter '%s'", payload_info['name'], param_name)
 
             return vulnerability
             
@@ -338,6 +628,36 @@ class SQLInjectionScanner(BaseScanner):
             self.logger.error(f"Error testing SQL injection payload {payload_info['name']}: {str(e)}")
             return None
     
+    async def _get_baseline_response(
+        self, base_url: str, param_name: str, param_value: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get baseline response, issuing the request only once per URL
+        Concurrent payload tests await the same in-flight request
+        """
+        url = self._build_url_with_param(base_url, param_name, param_value)
+        baseline_request = self._baseline_requests.get(url)
+        if baseline_request is None:
+            baseline_request = asyncio.ensure_future(
+                self._make_baseline_request(base_url, param_name, param_value)
+            )
+            self._baseline_requests[url] = baseline_request
+
+        # Shielded: cancelling one payload test must not cancel the shared baseline
+        baseline_response = await asyncio.shield(baseline_request)
+        if baseline_response is None:
+            # Don't cache failures - the next payload retries the baseline
+            self._baseline_requests.pop(url, None)
+        return baseline_response
+
+    def _get_response_time(self, response: httpx.Response, fallback: float) -> float:
+        """
+        Time spent on the wire for a response
+        httpx's elapsed excludes time queued on the rate limiter/semaphore; wall time otherwise
+        """
+        elapsed = getattr(response, 'elapsed', None)
+        return elapsed.total_seconds() if isinstance(elapsed, timedelta) else fallback
+
     async def _make_baseline_request(
         self, base_url: str, param_name: str, param_value: str
     ) -> Optional[Dict[str, Any]]:
@@ -348,16 +668,16 @@ class SQLInjectionScanner(BaseScanner):
             # Build URL with original parameter
             url = self._build_url_with_param(base_url, param_name, param_value)
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             response = await self._make_request(url, timeout=self.session_timeout)
-            end_time = time.time()
+            end_time = time.perf_counter()
             
             if response:
                 return {
                     'content': response.text,
                     'status_code': response.status_code,
                     'headers': dict(response.headers),
-                    'response_time': end_time - start_time,
+                    'response_time': self._get_response_time(response, end_time - start_time),
                     'content_length': len(response.text)
                 }
             
@@ -377,16 +697,16 @@ class SQLInjectionScanner(BaseScanner):
             # Build URL with malicious payload
             url = self._build_url_with_param(base_url, param_name, payload)
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             response = await self._make_request(url, timeout=self.session_timeout)
-            end_time = time.time()
+            end_time = time.perf_counter()
             
             if response:
                 return {
                     'content': response.text,
                     'status_code': response.status_code,
                     'headers': dict(response.headers),
-                    'response_time': end_time - start_time,
+                    'response_time': self._get_response_time(response, end_time - start_time),
                     'content_length': len(response.text),
                     'payload': payload
                 }
@@ -397,34 +717,6 @@ class SQLInjectionScanner(BaseScanner):
             self.logger.error(f"Error making malicious request with payload {payload}: {str(e)}")
             return None
     
-    def _build_url_with_param(self, base_url: str, param_name: str, param_value: str) -> str:
-        """
-        Build URL with specific parameter value
-        """
-        try:
-            parsed_url = urlparse(base_url)
-            query_params = parse_qs(parsed_url.query)
-            
-            # Update the specific parameter
-            query_params[param_name] = [param_value]
-            
-            # Rebuild URL
-            new_query = urlencode(query_params, doseq=True)
-            new_url = urlunparse((
-                parsed_url.scheme,
-                parsed_url.netloc,
-                parsed_url.path,
-                parsed_url.params,
-                new_query,
-                parsed_url.fragment
-            ))
-            
-            return new_url
-            
-        except Exception as e:
-            self.logger.error(f"Error building URL with parameter: {str(e)}")
-            return base_url
-
     async def _analyze_responses(
         self,
         baseline_response: Dict[str, Any],
@@ -446,9 +738,16 @@ class SQLInjectionScanner(BaseScanner):
 
             # Error-based detection
             if injection_type == 'error_based':
-                is_vulnerable, confidence, evidence = self._detect_error_based(
-                    baseline_response, malicious_response
-                )
+                # Large bodies are regex-scanned off the event loop so concurrent probes keep flowing
+                if malicious_response['content_length'] > SQLI_ERROR_SCAN_OFFLOAD_SIZE:
+                    loop = asyncio.get_running_loop()
+                    is_vulnerable, confidence, evidence = await loop.run_in_executor(
+                        None, self._detect_error_based, baseline_response, malicious_response
+                    )
+                else:
+                    is_vulnerable, confidence, evidence = self._detect_error_based(
+                        baseline_response, malicious_response
+                    )
 
             # Boolean-based detection
             elif injection_type == 'boolean_based':
@@ -503,6 +802,56 @@ class SQLInjectionScanner(BaseScanner):
             self.logger.error(f"Error analyzing responses: {str(e)}")
             return None
 
+    def _identify_database(self, content: str) -> str:
+        """
+        Identify the DBMS behind an SQL error message
+        """
+        match = self.dbms_regex.search(content)
+        return match.lastgroup if match else 'unknown'
+
+    def _get_lowered_content(self, response: Dict[str, Any]) -> str:
+        """
+        Lowercased response body, computed once per response dict
+        The shared baseline is compared against every payload's response
+        """
+        lowered = response.get('content_lower')
+        if lowered is None:
+            lowered = response['content'].lower()
+            response['content_lower'] = lowered
+        return lowered
+
+    def _scan_sql_errors(self, content: str) -> Tuple[Tuple[str, ...], Optional[str]]:
+        """
+        Scan a lowercased body for SQL errors: (matched patterns, DBMS or None if no error)
+        Memoised per body - endpoints often return the same page for many payloads
+        """
+        # Keyed on the body itself - colliding (length, hash) keys would share results
+        with self._error_scan_cache_lock:
+            cached = self._error_scan_cache.get(content)
+        if cached is not None:
+            return cached
+
+        detected_errors: Tuple[str, ...] = ()
+        database = None
+
+        # Cheap literal prefilter, then single fused scan, per-pattern pass only on a hit
+        prefilter_hit = self.error_literals is None or any(
+            literal in content for literal in self.error_literals
+        )
+        if prefilter_hit and self.error_regex.search(content):
+            detected_errors = tuple(
+                pattern for pattern, compiled_pattern in self.compiled_error_patterns
+                if compiled_pattern.search(content)
+            )
+            database = self._identify_database(content)
+
+        # FIFO eviction keeps the cache bounded
+        with self._error_scan_cache_lock:
+            if len(self._error_scan_cache) >= SQLI_ERROR_SCAN_CACHE_SIZE:
+                self._error_scan_cache.pop(next(iter(self._error_scan_cache)), None)
+            self._error_scan_cache[content] = (detected_errors, database)
+        return detected_errors, database
+
     def _detect_error_based(
         self, baseline_response: Dict[str, Any], malicious_response: Dict[str, Any]
     ) -> Tuple[bool, float, Dict[str, Any]]:
@@ -515,10 +864,11 @@ class SQLInjectionScanner(BaseScanner):
             malicious_content = malicious_response['content'].lower()
             evidence = {'detected_errors': []}
 
-            # Check for SQL error patterns
-            for pattern in self.error_patterns:
-                if re.search(pattern.lower(), malicious_content):
-                    evidence['detected_errors'].append(pattern)
+            # Check for SQL error patterns (memoised per distinct body)
+            detected_errors, database = self._scan_sql_errors(malicious_content)
+            if database is not None:
+                evidence['detected_errors'].extend(detected_errors)
+                evidence['database'] = database
 
             # Check for status code changes indicating errors
             status_changed = (
@@ -527,20 +877,17 @@ class SQLInjectionScanner(BaseScanner):
             )
 
             # Enhanced detection: Check for any response differences that might indicate SQL injection
-            baseline_content = baseline_response['content'].lower()
-            content_length_diff = abs(len(malicious_content) - len(baseline_content))
-
-            # Check for common SQL injection indicators in response
-            sql_indicators = [
-                'syntax error', 'mysql', 'sql', 'database', 'table', 'column',
-                'select', 'union', 'where', 'from', 'error', 'warning'
-            ]
+            content_length_diff = abs(len(malicious_content) - len(baseline_response['content']))
 
             indicator_found = False
-            for indicator in sql_indicators:
-                if indicator in malicious_content and indicator not in baseline_content:
-                    evidence['detected_errors'].append(f"SQL indicator: {indicator}")
-                    indicator_found = True
+            # Identical bodies can't carry new indicators - skip lowercasing and scanning the baseline
+            if content_length_diff or malicious_response['content'] != baseline_response['content']:
+                baseline_content = self._get_lowered_content(baseline_response)
+                # Check for common SQL injection indicators in response
+                for indicator in SQLI_RESPONSE_INDICATORS:
+                    if indicator in malicious_content and indicator not in baseline_content:
+                        evidence['detected_errors'].append(f"SQL indicator: {indicator}")
+                        indicator_found = True
 
             if evidence['detected_errors'] or status_changed or indicator_found or content_length_diff > 50:
                 if evidence['detected_errors']:
@@ -617,6 +964,17 @@ class SQLInjectionScanner(BaseScanner):
             self.logger.error(f"Error in boolean-based detection: {str(e)}")
             return False, 0.0, {}
 
+    def _find_version_patterns(self, content: str) -> set:
+        """
+        Indexes of SQLI_VERSION_PATTERNS present in content, in one pass over the body
+        """
+        found = set()
+        for match in SQLI_VERSION_REGEX.finditer(content):
+            found.add(int(match.lastgroup[1:]))
+            if len(found) == len(SQLI_VERSION_PATTERNS):
+                break
+        return found
+
     def _detect_union_based(
         self,
         baseline_response: Dict[str, Any],
@@ -632,31 +990,25 @@ class SQLInjectionScanner(BaseScanner):
             malicious_content = malicious_response['content'].lower()
             evidence = {'detected_data': []}
 
-            # Check for database information disclosure
-            union_indicators = [
-                'mysql',
-                'version()',
-                'database()',
-                'user()',
-                'information_schema',
-                'table_name',
-                'column_name'
-            ]
-
-            for indicator in union_indicators:
-                if indicator in malicious_content:
-                    evidence['detected_data'].append(indicator)
-
-            # Check for typical database version patterns
-            version_patterns = [
-                r'\d+\.\d+\.\d+',  # Version numbers like 5.7.34
-                r'mariadb',
-                r'mysql'
-            ]
-
-            for pattern in version_patterns:
-                if re.search(pattern, malicious_content):
-                    evidence['detected_data'].append(f"version_pattern: {pattern}")
+            # Only data the probe disclosed counts - an unchanged body disclosed nothing, and the
+            # baseline is only lowercased/scanned for indicators the probe response actually contains
+            if malicious_response['content'] != baseline_response['content']:
+                baseline_content = None
+
+                for indicator in SQLI_UNION_INDICATORS:
+                    if indicator in malicious_content:
+                        if baseline_content is None:
+                            baseline_content = self._get_lowered_content(baseline_response)
+                        if indicator not in baseline_content:
+                            evidence['detected_data'].append(indicator)
+
+                version_matches = self._find_version_patterns(malicious_content)
+                if version_matches:
+                    if baseline_content is None:
+                        baseline_content = self._get_lowered_content(baseline_response)
+                    baseline_matches = self._find_version_patterns(baseline_content)
+                    for index in sorted(version_matches - baseline_matches):
+                        evidence['detected_data'].append(f"version_pattern: {SQLI_VERSION_PATTERNS[index]}")
 
             # Enhanced union detection: Check for response differences
             baseline_length = baseline_response['content_length']
@@ -705,14 +1057,22 @@ class SQLInjectionScanner(BaseScanner):
             malicious_time = malicious_response['response_time']
             time_diff = malicious_time - baseline_time
 
+            # Delay the payload asked for - single precompiled scan, default when not recognised
+            delay_match = SQLI_DELAY_REGEX.search(malicious_response.get('payload', ''))
+            expected_delay = (
+                int(next(group for group in delay_match.groups() if group))
+                if delay_match else SQLI_DEFAULT_DELAY
+            )
+
             evidence = {
                 'baseline_time': baseline_time,
                 'malicious_time': malicious_time,
-                'time_difference': time_diff
+                'time_difference': time_diff,
+                'expected_delay': expected_delay
             }
 
             # Enhanced time-based detection with multiple thresholds
-            if time_diff > 4.0:  # 5 seconds minus tolerance - high confidence
+            if time_diff > expected_delay * 0.8:  # Requested delay minus 20% tolerance - high confidence
                 confidence = 0.9
                 evidence['time_delay_detected'] = True
                 evidence['delay_type'] = 'significant'
@@ -738,11 +1098,4 @@ class SQLInjectionScanner(BaseScanner):
         """
         Map injection type to VulnerabilityType enum value
         """
-        type_mapping = {
-            'error_based': VulnerabilityType.ERROR_BASED_SQLI.value,
-            'union_based': VulnerabilityType.UNION_BASED_SQLI.value,
-            'boolean_based': VulnerabilityType.BOOLEAN_BLIND_SQLI.value,
-            'time_based': VulnerabilityType.TIME_BASED_SQLI.value
-        }
-
-        return type_mapping.get(injection_type, VulnerabilityType.SQL_INJECTION.value)
+        return INJECTION_TYPE_TO_VULN_TYPE.get(injection_type, VulnerabilityType.SQL_INJECTION.value)
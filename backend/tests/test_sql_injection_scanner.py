@@ -133,6 +133,15 @@ class TestSQLInjectionScanner:
         assert is_vulnerable is False
         assert confidence == 0.0
     
+    def test_identify_database(self, scanner):
+        """Test DBMS fingerprinting from SQL error messages"""
+        assert scanner._identify_database(
+            "You have an error in your SQL syntax; check the manual for your MySQL server version"
+        ) == 'mysql'
+        assert scanner._identify_database("ORA-01756: quoted string not properly terminated") == 'oracle'
+        assert scanner._identify_database("Warning: pg_query(): Query failed") == 'postgresql'
+        assert scanner._identify_database("Normal response") == 'unknown'
+    
     def test_detect_boolean_based(self, scanner):
         """Test boolean-based SQL injection detection"""
         baseline_response = {
@@ -336,3 +345,58 @@ class TestSQLInjectionScanner:
             assert result['scan_summary']['total_tests'] > 0
             assert 'scan_metadata' in result
             assert 'duration' in result['scan_metadata']
+    
+    @pytest.mark.asyncio
+    async def test_scan_reuses_baseline_request(self, scanner):
+        """Test baseline request is made once per parameter, not once per payload"""
+        target_url = "http://example.com/test?id=1"
+        
+        with patch.object(scanner, '_make_request', new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = Mock(text="Normal response", status_code=200, headers={})
+            
+            result = await scanner.scan(target_url)
+            
+            assert result['scan_summary']['total_tests'] == len(scanner.payloads)
+            assert mock_request.call_count == len(scanner.payloads) + 1
+    
+    @pytest.mark.asyncio
+    async def test_scan_prioritizes_fingerprinted_time_payloads(self, scanner):
+        """Test time-based testing tries the fingerprinted DBMS first and skips the rest on a hit"""
+        from datetime import timedelta
+        
+        async def mock_request(url, **kwargs):
+            if url.endswith("%27"):
+                content = "You have an error in your SQL syntax; check the manual for your MySQL server version"
+            else:
+                content = "Normal response"
+            delay = 5.0 if "SLEEP" in url else 0.1
+            return Mock(text=content, status_code=200, headers={}, elapsed=timedelta(seconds=delay))
+        
+        with patch.object(scanner, '_make_request', side_effect=mock_request) as mock_request_call:
+            result = await scanner.scan("http://example.com/test?id=1")
+            
+            requested_urls = [call.args[0] for call in mock_request_call.call_args_list]
+            assert any("SLEEP" in url for url in requested_urls)
+            assert not any("pg_sleep" in url for url in requested_urls)
+            assert any(v['title'] == "SQL Injection - Time-based Blind MySQL" for v in result['vulnerabilities'])
+            # Skipped fallback probes are not counted as tests
+            skipped = [p for p in scanner.payloads if p['type'] == 'time_based' and p.get('database') != 'mysql']
+            assert skipped
+            assert result['scan_summary']['total_tests'] <= len(scanner.payloads) - len(skipped)
+    
+    @pytest.mark.asyncio
+    async def test_scan_skips_time_payloads_when_quote_probe_is_ignored(self, scanner):
+        """Test time-based payloads are skipped when a stray quote leaves the response unchanged"""
+        target_url = "http://example.com/test?id=1"
+        scanner.time_based_requires_reaction = True
+        
+        with patch.object(scanner, '_make_request', new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = Mock(text="Normal response", status_code=200, headers={})
+            
+            result = await scanner.scan(target_url)
+            
+            requested_urls = [call.args[0] for call in mock_request.call_args_list]
+            assert any(url.endswith("id=1%27") for url in requested_urls)
+            assert not any("SLEEP" in url or "pg_sleep" in url for url in requested_urls)
+            time_payloads = [p for p in scanner.payloads if p['type'] == 'time_based']
+            assert result['scan_summary']['total_tests'] == len(scanner.payloads) - len(time_payloads)
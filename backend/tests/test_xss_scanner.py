@@ -8,7 +8,7 @@ import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from httpx import Response
 
-from app.services.scanner.xss_scanner import XSSScanner
+from app.services.scanner.xss_scanner import XSSScanner, XSS_REFLECTION_CANARY
 from app.models.vulnerability import VulnerabilityType, VulnerabilityRisk
 
 
@@ -82,6 +82,21 @@ class TestXSSScanner:
         assert any('script' in pattern for pattern in script_patterns)
         assert any('alert' in pattern for pattern in script_patterns)
     
+    def test_payload_subsets_dedupe_per_phase(self):
+        """Test duplicate payload strings are dropped within a phase but not across phases"""
+        shared = "<script>alert('XSS')</script>"
+        payloads = [
+            {'name': 'Reflected', 'payload': shared, 'type': 'reflected', 'context': 'html'},
+            {'name': 'Reflected Copy', 'payload': shared, 'type': 'reflected', 'context': 'html'},
+            {'name': 'Stored', 'payload': shared, 'type': 'stored', 'context': 'html'},
+        ]
+        
+        with patch.object(XSSScanner, '_load_xss_payloads', return_value=payloads):
+            scanner = XSSScanner()
+        
+        assert [p['name'] for p in scanner.reflected_payloads] == ['Reflected']
+        assert [p['name'] for p in scanner.stored_payloads] == ['Stored']
+    
     @pytest.mark.asyncio
     async def test_reflected_xss_detection(self, xss_scanner, mock_response):
         """Test reflected XSS detection based on DVWA findings"""
@@ -204,6 +219,85 @@ class TestXSSScanner:
         assert 'search' in parameters
         assert 'query' in parameters
     
+    @pytest.mark.asyncio
+    async def test_parameter_payloads_stop_after_confirmed_context(self, xss_scanner):
+        """Test sibling payloads of a confirmed (type, context) are cancelled"""
+
+        first_payload = xss_scanner.parameter_payloads[0]
+        payload_class = (first_payload['type'], first_payload['context'])
+
+        async def fake_test_xss_payload(target_url, param_name, original_value, payload_info, method):
+            if payload_info is first_payload:
+                return {'title': 'XSS', 'risk': VulnerabilityRisk.HIGH.value}
+            # Siblings are slower, so the confirmed class cancels them before they finish
+            await asyncio.sleep(0.05)
+            return None
+
+        with patch.object(xss_scanner, '_test_xss_payload', side_effect=fake_test_xss_payload), \
+                patch.object(xss_scanner, '_is_parameter_reflected', new_callable=AsyncMock, return_value=True):
+            tested, vulnerabilities = await xss_scanner._test_parameter_payloads(
+                "http://localhost/dvwa/vulnerabilities/xss_r/?name=test", 'name', 'test'
+            )
+
+        siblings = sum(
+            1 for p in xss_scanner.parameter_payloads if (p['type'], p['context']) == payload_class
+        ) - 1
+        assert len(vulnerabilities) == 1
+        assert tested == len(xss_scanner.parameter_payloads) - siblings
+
+    @pytest.mark.asyncio
+    async def test_parameter_payloads_share_baseline_request(self, xss_scanner, mock_response):
+        """Test the baseline for a parameter is requested once, not once per payload"""
+
+        mock_response.text = f"Hello {XSS_REFLECTION_CANARY}"
+
+        with patch.object(xss_scanner, '_make_request', new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = mock_response
+            tested, vulnerabilities = await xss_scanner._test_parameter_payloads(
+                "http://localhost/dvwa/vulnerabilities/xss_r/?name=test", 'name', 'test'
+            )
+
+        assert vulnerabilities == []
+        assert tested == len(xss_scanner.parameter_payloads)
+        # Canary, one shared baseline, one request per payload
+        assert mock_request.call_count == len(xss_scanner.parameter_payloads) + 2
+
+    @pytest.mark.asyncio
+    async def test_unreflected_parameter_skips_reflected_payloads(self, xss_scanner, mock_response):
+        """Test a parameter the server never echoes only gets DOM payloads"""
+
+        mock_response.text = "Hello"
+
+        with patch.object(xss_scanner, '_make_request', new_callable=AsyncMock) as mock_request:
+            mock_request.return_value = mock_response
+            tested, vulnerabilities = await xss_scanner._test_parameter_payloads(
+                "http://localhost/dvwa/vulnerabilities/xss_r/?name=test", 'name', 'test'
+            )
+
+        assert vulnerabilities == []
+        assert tested == len(xss_scanner.dom_payloads)
+
+    @pytest.mark.asyncio
+    async def test_scan_runs_every_phase(self, xss_scanner, mock_response):
+        """Test a scan completes without error and reaches the DOM XSS phase"""
+
+        mock_response.text = "Hello"
+        xss_scanner.request_delay = 0
+
+        with patch.object(xss_scanner, '_make_request', new_callable=AsyncMock) as mock_request, \
+                patch.object(xss_scanner, '_discover_forms', new_callable=AsyncMock) as mock_forms, \
+                patch.object(xss_scanner, '_test_dom_payload', new_callable=AsyncMock) as mock_dom:
+            mock_request.return_value = mock_response
+            mock_forms.return_value = []
+            mock_dom.return_value = None
+
+            results = await xss_scanner.scan("http://example.com/a?q=1")
+
+        assert 'error' not in results
+        # Fragment and parameter probe per DOM payload
+        assert mock_dom.call_count == 2 * len(xss_scanner.dom_payloads)
+        assert results['scan_summary']['total_tests'] >= len(xss_scanner.dom_payloads)
+
     @pytest.mark.asyncio
     async def test_vulnerability_type_mapping(self, xss_scanner):
         """Test XSS type to vulnerability type mapping"""